@@ -1,9 +1,10 @@
 from collections import defaultdict
 from enum import Enum
-from typing import Generic, TypeVar, Union, Optional, Protocol
+from typing import TYPE_CHECKING, Generic, TypeVar, Union, Optional, Protocol
 import dataclasses as dc
 from dataclasses import dataclass, field
 from textwrap import indent
+import weakref
 
 import networkx  # type: ignore
 
@@ -123,14 +124,14 @@ class VarType:
 
     def could_become(self, supertype: "VarType") -> bool:
         return (
-            self.visibility in [supertype.visibility, None]
-            and self.datatype in [supertype.datatype, None]
-            and self._dims in [supertype._dims, None]
+            (self.visibility is None or self.visibility is supertype.visibility)
+            and (self.datatype is None or self.datatype is supertype.datatype)
+            and (self._dims is None or self._dims == supertype._dims)
             and all(
                 t.could_become(subtype)
                 for t, subtype in zip(self.tuple_types, supertype.tuple_types)
             )
-            and self.dim_sizes in [supertype.dim_sizes, None]
+            and (self.dim_sizes is None or self.dim_sizes == supertype.dim_sizes)
         )
 
     def is_complete(self) -> bool:
@@ -157,82 +158,98 @@ class VarType:
         # TODO: switch all type errors to syntax errors with the locations of the offending
         # code in the original source code
 
+        def merge_error(difference: str) -> TypeError:
+            return TypeError(
+                "Cannot merge types with different {}:\n{}".format(
+                    difference, "\n".join(repr(t) for t in types)
+                )
+            )
+
+        # Collect everything in a single pass over `types`; conflicts are
+        # reported afterwards, in the same order as the checks below.
+        visibility: Optional[VarVisibility] = None
+        visibility_conflict = False
+        any_shared = False
+        all_plaintext = True
+        dims: Optional[int] = None
+        dims_conflict = False
+        datatype: Optional[DataType] = None
+        datatype_conflict = False
+        tuple_len = len(types[0].tuple_types)
+        tuple_len_conflict = False
+        dim_sizes: Optional[tuple[LoopBound, ...]] = None
+        dim_sizes_conflict = False
+
+        for t in types:
+            if t.visibility is VarVisibility.SHARED:
+                any_shared = True
+            elif t.visibility is not VarVisibility.PLAINTEXT:
+                all_plaintext = False
+            if t.visibility is not None:
+                if visibility is None:
+                    visibility = t.visibility
+                elif t.visibility is not visibility:
+                    visibility_conflict = True
+
+            t_dims = t.dims
+            if t_dims is not None:
+                if dims is None:
+                    dims = t_dims
+                elif use_max_dim_size:
+                    dims = max(dims, t_dims)
+                elif t_dims != dims:
+                    dims_conflict = True
+
+            if t.datatype is not None:
+                if datatype is None:
+                    datatype = t.datatype
+                elif t.datatype is not datatype:
+                    datatype_conflict = True
+
+            if len(t.tuple_types) != tuple_len:
+                tuple_len_conflict = True
+
+            if t.dim_sizes is not None:
+                t_dim_sizes = tuple(t.dim_sizes)
+                if dim_sizes is None:
+                    dim_sizes = t_dim_sizes
+                elif use_max_dim_size:
+                    if len(t_dim_sizes) > len(dim_sizes):
+                        dim_sizes = t_dim_sizes
+                elif t_dim_sizes != dim_sizes:
+                    dim_sizes_conflict = True
+
         merged_type = VarType()
 
         # Determine the visibility of the merged type
-        elem_visibilities = [t.visibility for t in types]
-        if (
-            len(set(filter(lambda x: x is not None, elem_visibilities))) > 1
-            and not mixed_shared_plaintext_allowed
-        ):
-            raise TypeError(
-                "Cannot merge types with different visibilities:\n{}".format(
-                    "\n".join(repr(t) for t in types)
-                )
-            )
-        if any(v == VarVisibility.SHARED for v in elem_visibilities):
+        if visibility_conflict and not mixed_shared_plaintext_allowed:
+            raise merge_error("visibilities")
+        if any_shared:
             merged_type.visibility = VarVisibility.SHARED
-        elif all(v == VarVisibility.PLAINTEXT for v in elem_visibilities):
+        elif all_plaintext:
             merged_type.visibility = VarVisibility.PLAINTEXT
 
         # Determine the dimensionality of the merged type
-        elem_dims = [t.dims for t in types if t.dims is not None]
-        if len(set(elem_dims)) > 0 and use_max_dim_size:
-            elem_dims = [max(elem_dims)]
-
-        if len(set(elem_dims)) > 1:
-            raise TypeError(
-                "Cannot merge types with different dimensionality:\n{}".format(
-                    "\n".join(repr(t) for t in types)
-                )
-            )
-        if len(elem_dims) > 0:
-            merged_type._dims = elem_dims[0]
+        if dims_conflict:
+            raise merge_error("dimensionality")
+        merged_type._dims = dims
 
         # Determine the datatype of the merged type
-        elem_datatypes = [t.datatype for t in types if t.datatype is not None]
-        if len(set(elem_datatypes)) > 1 and not mixed_datatypes_allowed:
-            raise TypeError(
-                "Cannot merge types with different datatypes:\n{}".format(
-                    "\n".join(repr(t) for t in types)
-                )
-            )
-        if len(elem_datatypes) > 0:
-            merged_type.datatype = elem_datatypes[0]
+        if datatype_conflict and not mixed_datatypes_allowed:
+            raise merge_error("datatypes")
+        merged_type.datatype = datatype
 
         # Determine the tuple types of the merged type
-        if len(set(len(t.tuple_types) for t in types)) > 1:
-            raise TypeError(
-                "Cannot merge types with different tuple types:\n{}".format(
-                    "\n".join(repr(t) for t in types)
-                )
-            )
-        tuple_len = len(types[0].tuple_types)
-        merged_type.tuple_types = [VarType() for _ in range(tuple_len)]
-
-        elem_tuple_types = [[t.tuple_types[i] for t in types] for i in range(tuple_len)]
-        for i in range(tuple_len):
-            if len(set(elem_tuple_types[i])) > 1:
-                raise TypeError(
-                    "Cannot merge types with different tuple types:\n{}".format(
-                        "\n".join(repr(t) for t in types)
-                    )
-                )
-            if len(elem_tuple_types[i]) > 0:
-                merged_type.tuple_types[i] = elem_tuple_types[i][0]
+        if tuple_len_conflict:
+            raise merge_error("tuple types")
+        merged_type.tuple_types = list(types[0].tuple_types)
+        if any(t.tuple_types != merged_type.tuple_types for t in types[1:]):
+            raise merge_error("tuple types")
 
-        dim_sizes = [tuple(t.dim_sizes) for t in types if t.dim_sizes is not None]
-        if len(set(dim_sizes)) > 0 and use_max_dim_size:
-            dim_sizes = [max(dim_sizes, key=len)]
-
-        if len(set(dim_sizes)) > 1:
-            raise TypeError(
-                "Cannot merge types with different dimension sizes:\n{}".format(
-                    "\n".join(repr(t) for t in types)
-                )
-            )
-        if len(set(dim_sizes)) > 0:
-            merged_type.dim_sizes = list(dim_sizes[0])
+        if dim_sizes_conflict:
+            raise merge_error("dimension sizes")
+        if dim_sizes is not None:
+            merged_type.dim_sizes = list(dim_sizes)
 
         return merged_type
 
@@ -240,41 +257,68 @@ class VarType:
         if self.datatype == DataType.TUPLE:
             return "tuple[" + ", ".join(str(t) for t in self.tuple_types) + "]"
 
-        str_rep = f"{self.visibility}["
         if self.dim_sizes is not None:
-            for _ in self.dim_sizes:
-                str_rep += "list["
+            list_open = "list[" * len(self.dim_sizes)
+            list_close = "".join(f"; ({bound})]" for bound in self.dim_sizes)
         elif self._dims is not None:
-            for _ in range(self._dims):
-                str_rep += "list["
+            list_open = "list[" * self._dims
+            list_close = "; ?]" * self._dims
+        else:
+            list_open = list_close = ""
 
-        str_rep += f"{self.datatype}"
+        return f"{self.visibility}[{list_open}{self.datatype}{list_close}]" + (
+            "(unknown dims)" if self.dims is None else ""
+        )
 
-        if self.dim_sizes is not None:
-            for bound in self.dim_sizes:
-                str_rep += f"; ({bound})]"
-        elif self._dims is not None:
-            for _ in range(self._dims):
-                str_rep += "; ?]"
 
-        str_rep += "]"
-        if self.dims is None:
-            str_rep += "(unknown dims)"
-        return str_rep
+PLAINTEXT_INT = VarType(VarVisibility.PLAINTEXT, 0, DataType.INT)
 
 
-PLAINTEXT_INT = VarType(VarVisibility.PLAINTEXT, 0, DataType.INT)
+# Interned `Var` and `Constant` instances, keyed by their field values.
+# Both types are immutable, so structurally equal values can share one object.
+# Interning lasts for the whole process, across compilations, so the tables only
+# hold weak references: an instance is dropped once nothing else refers to it.
+_var_cache: "weakref.WeakValueDictionary[tuple, Var]" = weakref.WeakValueDictionary()
+_constant_cache: "weakref.WeakValueDictionary[tuple, Constant]" = (
+    weakref.WeakValueDictionary()
+)
 
 
-@dataclass(frozen=True)
+# `Var` and `Constant` are built in `__new__` (`init=False`) so that an interned
+# instance isn't re-initialized, and so their fields need no class-level
+# defaults, which would conflict with `__slots__`.
+@dataclass(frozen=True, init=False)
 class Var:
     """A variable named `name`"""
 
+    __slots__ = ("name", "rename_subscript", "_hash", "__weakref__")
+
     # This is a string for user-provided variables,
     # and an integer for temporary variables the compiler automatically generates
     name: Union[str, int]
 
-    rename_subscript: Optional[int] = None
+    rename_subscript: Optional[int]
+
+    if TYPE_CHECKING:
+        # Set in `__new__`. Not a dataclass field, so `dc.replace` ignores it.
+        _hash: int
+
+    def __new__(cls, name: Union[str, int], rename_subscript: Optional[int] = None):
+        key = (cls, name, rename_subscript)
+        var = _var_cache.get(key)
+        if var is None:
+            var = super().__new__(cls)
+            object.__setattr__(var, "name", name)
+            object.__setattr__(var, "rename_subscript", rename_subscript)
+            object.__setattr__(var, "_hash", hash((name, rename_subscript)))
+            _var_cache[key] = var
+        return var
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __reduce__(self):
+        return (type(self), (self.name, self.rename_subscript))
 
     def __str__(self) -> str:
         name = self.name if isinstance(self.name, str) else f"!{self.name}"
@@ -309,13 +353,37 @@ class Parameter:
         return f"{self.var}: {self.var_type}"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, init=False)
 class Constant:
     """A constant with value `value`"""
 
+    __slots__ = ("value", "datatype", "_hash", "__weakref__")
+
     value: Union[int, bool]
     datatype: DataType
 
+    if TYPE_CHECKING:
+        # Set in `__new__`. Not a dataclass field, so `dc.replace` ignores it.
+        _hash: int
+
+    def __new__(cls, value: Union[int, bool], datatype: DataType):
+        # `True == 1`, so the value's type is part of the key
+        key = (cls, type(value), value, datatype)
+        constant = _constant_cache.get(key)
+        if constant is None:
+            constant = super().__new__(cls)
+            object.__setattr__(constant, "value", value)
+            object.__setattr__(constant, "datatype", datatype)
+            object.__setattr__(constant, "_hash", hash((value, datatype)))
+            _constant_cache[key] = constant
+        return constant
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __reduce__(self):
+        return (type(self), (self.value, self.datatype))
+
     def __str__(self) -> str:
         return str(self.value)
 
@@ -348,86 +416,78 @@ class BinOpKind(Enum):
     BIT_XOR = "^"
 
     def get_ret_datatype(self) -> Optional[DataType]:
-        if self in (BinOpKind.ADD, BinOpKind.SUB, BinOpKind.MUL, BinOpKind.DIV):
-            return DataType.INT
-
-        elif self in (
-            BinOpKind.LT,
-            BinOpKind.GT,
-            BinOpKind.LT_E,
-            BinOpKind.GT_E,
-            BinOpKind.EQ,
-            BinOpKind.NOT_EQ,
-            BinOpKind.AND,
-            BinOpKind.OR,
-        ):
-            return DataType.BOOL
-
-        elif self in (BinOpKind.BIT_AND, BinOpKind.BIT_XOR, BinOpKind.BIT_OR):
-            return None  # return type is the same as the inputs
-
-        else:
-            raise ValueError(f"Unhandled binary operation {self}")
+        # `None` means the return type is the same as the inputs
+        return _BINOP_RET_DATATYPES[self]
 
     def get_operand_datatypes(self) -> list[DataType]:
-        if self in (
-            BinOpKind.ADD,
-            BinOpKind.SUB,
-            BinOpKind.MUL,
-            BinOpKind.DIV,
-            BinOpKind.LT,
-            BinOpKind.GT,
-            BinOpKind.LT_E,
-            BinOpKind.GT_E,
-        ):
-            return [DataType.INT]
-
-        elif self in (
-            BinOpKind.EQ,
-            BinOpKind.NOT_EQ,
-            BinOpKind.AND,
-            BinOpKind.OR,
-            BinOpKind.BIT_AND,
-            BinOpKind.BIT_OR,
-            BinOpKind.BIT_XOR,
-        ):
-            return [DataType.INT, DataType.BOOL]
-
-        else:
-            raise ValueError(f"Unhandled binary operation {self}")
+        return list(_BINOP_OPERAND_DATATYPES[self])
 
     def __str__(self) -> str:
         return self.value
 
 
+_BINOP_RET_DATATYPES: dict[BinOpKind, Optional[DataType]] = {
+    BinOpKind.ADD: DataType.INT,
+    BinOpKind.SUB: DataType.INT,
+    BinOpKind.MUL: DataType.INT,
+    BinOpKind.DIV: DataType.INT,
+    BinOpKind.LT: DataType.BOOL,
+    BinOpKind.GT: DataType.BOOL,
+    BinOpKind.LT_E: DataType.BOOL,
+    BinOpKind.GT_E: DataType.BOOL,
+    BinOpKind.EQ: DataType.BOOL,
+    BinOpKind.NOT_EQ: DataType.BOOL,
+    BinOpKind.AND: DataType.BOOL,
+    BinOpKind.OR: DataType.BOOL,
+    BinOpKind.BIT_AND: None,
+    BinOpKind.BIT_OR: None,
+    BinOpKind.BIT_XOR: None,
+}
+
+_BINOP_OPERAND_DATATYPES: dict[BinOpKind, tuple[DataType, ...]] = {
+    BinOpKind.ADD: (DataType.INT,),
+    BinOpKind.SUB: (DataType.INT,),
+    BinOpKind.MUL: (DataType.INT,),
+    BinOpKind.DIV: (DataType.INT,),
+    BinOpKind.LT: (DataType.INT,),
+    BinOpKind.GT: (DataType.INT,),
+    BinOpKind.LT_E: (DataType.INT,),
+    BinOpKind.GT_E: (DataType.INT,),
+    BinOpKind.EQ: (DataType.INT, DataType.BOOL),
+    BinOpKind.NOT_EQ: (DataType.INT, DataType.BOOL),
+    BinOpKind.AND: (DataType.INT, DataType.BOOL),
+    BinOpKind.OR: (DataType.INT, DataType.BOOL),
+    BinOpKind.BIT_AND: (DataType.INT, DataType.BOOL),
+    BinOpKind.BIT_OR: (DataType.INT, DataType.BOOL),
+    BinOpKind.BIT_XOR: (DataType.INT, DataType.BOOL),
+}
+
+
 class UnaryOpKind(Enum):
     NEGATE = "-"
     NOT = "not"
 
     def get_ret_datatype(self) -> DataType:
-        if self == UnaryOpKind.NEGATE:
-            return DataType.INT
-
-        elif self == UnaryOpKind.NOT:
-            return DataType.BOOL
-
-        else:
-            raise ValueError(f"Unhandled unary operation {self}")
+        return _UNARYOP_RET_DATATYPES[self]
 
     def get_operand_datatypes(self) -> list[DataType]:
-        if self == UnaryOpKind.NEGATE:
-            return [DataType.INT]
-
-        elif self == UnaryOpKind.NOT:
-            return [DataType.BOOL, DataType.INT]
-
-        else:
-            raise ValueError(f"Unhandled unary operation {self}")
+        return list(_UNARYOP_OPERAND_DATATYPES[self])
 
     def __str__(self) -> str:
         return self.value
 
 
+_UNARYOP_RET_DATATYPES: dict[UnaryOpKind, DataType] = {
+    UnaryOpKind.NEGATE: DataType.INT,
+    UnaryOpKind.NOT: DataType.BOOL,
+}
+
+_UNARYOP_OPERAND_DATATYPES: dict[UnaryOpKind, tuple[DataType, ...]] = {
+    UnaryOpKind.NEGATE: (DataType.INT,),
+    UnaryOpKind.NOT: (DataType.BOOL, DataType.INT),
+}
+
+
 OPERAND = TypeVar("OPERAND")
 
 
@@ -435,12 +495,14 @@ OPERAND = TypeVar("OPERAND")
 class BinOp(Generic[OPERAND]):
     """A binary operator expression of the form `left operator right`"""
 
+    __slots__ = ("left", "operator", "right")
+
     left: OPERAND
     operator: BinOpKind
     right: OPERAND
 
     def __str__(self) -> str:
-        return f"({self.left} {self.operator} {self.right})"
+        return f"({self.left} {self.operator.value} {self.right})"
 
     def __hash__(self) -> int:
         return hash((self.left, self.operator, self.right))
@@ -450,22 +512,24 @@ class BinOp(Generic[OPERAND]):
 class UnaryOp(Generic[OPERAND]):
     """A unary operator expression of the form `operator operand`"""
 
+    __slots__ = ("operator", "operand")
+
     operator: UnaryOpKind
     operand: OPERAND
 
     def __str__(self) -> str:
-        return f"{self.operator} {self.operand}"
+        return f"{self.operator.value} {self.operand}"
 
     def __hash__(self) -> int:
         return hash((self.operator, self.operand))
 
 
 class SubscriptIndexBinOp(BinOp["SubscriptIndex"]):
-    pass
+    __slots__ = ()
 
 
 class SubscriptIndexUnaryOp(UnaryOp["SubscriptIndex"]):
-    pass
+    __slots__ = ()
 
 
 SubscriptIndex = Union[Var, Constant, SubscriptIndexBinOp, SubscriptIndexUnaryOp]
@@ -490,6 +554,8 @@ def subscript_index_accessed_vars(index: SubscriptIndex) -> list[Var]:
 class Subscript:
     """An array subscript expression of the form `array[index]`"""
 
+    __slots__ = ("array", "index")
+
     array: Var
     index: SubscriptIndex
 
@@ -544,13 +610,12 @@ class CFGFunction(Generic[BLOCK]):
 
     def __str__(self) -> str:
         parameters = ", ".join([str(parameter) for parameter in self.parameters])
-        block_indices = {block: i for i, block in enumerate(self.body.nodes)}
-        blocks = "\n".join(
-            [
-                f"Block {i}:\n{indent(str(block), '    ')}"
-                for i, block in enumerate(self.body.nodes)
-            ]
-        )
+        block_indices: dict[BLOCK, int] = dict()
+        block_strs: list[str] = []
+        for i, block in enumerate(self.body.nodes):
+            block_indices[block] = i
+            block_strs.append(f"Block {i}:\n{indent(str(block), '    ')}")
+        blocks = "\n".join(block_strs)
         edges = " ".join(
             [
                 f"({block_indices[u]}, {block_indices[v]}, {label})"
@@ -4,8 +4,9 @@ and for converting to a data type that reflects that restricted subset.
 """
 
 import ast
+import functools
 from dataclasses import dataclass
-from typing import Optional, final, NoReturn, Union, cast
+from typing import Any, Callable, ClassVar, Optional, final, NoReturn
 import sys
 
 from . import restricted_ast
@@ -17,11 +18,33 @@ class _SourceCodeInfo:
     filename: str
     text: str
 
+    @functools.cached_property
+    def lines(self) -> list[str]:
+        return self.text.splitlines()
+
 
 @dataclass
 class _StrictNodeVisitor(ast.NodeVisitor):
     source_code_info: _SourceCodeInfo
 
+    # `visit_*` method of each visitor class for each node type,
+    # so `visit` doesn't have to look it up by name for every node
+    _visit_methods: ClassVar[dict[type, Callable[..., Any]]] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._visit_methods = {}
+
+    def visit(self, node: ast.AST) -> Any:
+        try:
+            method = self._visit_methods[node.__class__]
+        except KeyError:
+            method = getattr(
+                type(self), "visit_" + node.__class__.__name__, type(self).generic_visit
+            )
+            self._visit_methods[node.__class__] = method
+        return method(self, node)
+
     def error_message(self) -> str:
         return "Unknown error"
 
@@ -38,7 +61,7 @@ class _StrictNodeVisitor(ast.NodeVisitor):
                 self.source_code_info.filename,
                 node.lineno,
                 node.col_offset + 1,
-                self.source_code_info.text.splitlines()[node.lineno - 1],
+                self.source_code_info.lines[node.lineno - 1],
             ),
         )
 
@@ -107,9 +130,8 @@ class _RangeBoundsGetter(_StrictNodeVisitor):
             self.raise_syntax_error(
                 node, "Keyword arguments in call to `range()` unsupported"
             )
-        bounds = [
-            _LoopBoundConverter(self.source_code_info).visit(arg) for arg in node.args
-        ]
+        bound_converter = _LoopBoundConverter(self.source_code_info)
+        bounds = [bound_converter.visit(arg) for arg in node.args]
         if len(bounds) == 1:
             return (restricted_ast.Constant(0, DataType.INT), bounds[0])
         elif len(bounds) == 2:
@@ -128,10 +150,11 @@ class _SubscriptIndexConverter(_StrictNodeVisitor):
         return restricted_ast.Var(name=node.id)
 
     def visit_Constant(self, node: ast.Constant) -> restricted_ast.SubscriptIndex:
-        if type(node.value) == int:
-            return restricted_ast.Constant(value=node.value, datatype=DataType.INT)
-        elif type(node.value) == bool:
+        # `bool` is a subclass of `int`, so it must be checked first
+        if isinstance(node.value, bool):
             return restricted_ast.Constant(value=node.value, datatype=DataType.BOOL)
+        elif isinstance(node.value, int):
+            return restricted_ast.Constant(value=node.value, datatype=DataType.INT)
         else:
             self.raise_syntax_error(node, "Unsupported constant type")
 
@@ -140,9 +163,9 @@ class _SubscriptIndexConverter(_StrictNodeVisitor):
         if operator is None:
             self.raise_syntax_error(node, "Unsupported binary operator")
         return restricted_ast.SubscriptIndexBinOp(
-            left=_SubscriptIndexConverter(self.source_code_info).visit(node.left),
+            left=self.visit(node.left),
             operator=operator,
-            right=_SubscriptIndexConverter(self.source_code_info).visit(node.right),
+            right=self.visit(node.right),
         )
 
     def visit_UnaryOp(self, node: ast.UnaryOp) -> restricted_ast.SubscriptIndex:
@@ -151,7 +174,7 @@ class _SubscriptIndexConverter(_StrictNodeVisitor):
             self.raise_syntax_error(node, "Unsupported unary operator")
         return restricted_ast.SubscriptIndexUnaryOp(
             operator=operator,
-            operand=_SubscriptIndexConverter(self.source_code_info).visit(node.operand),
+            operand=self.visit(node.operand),
         )
 
 
@@ -175,57 +198,50 @@ class _AssignLHSConverter(_StrictNodeVisitor):
         return restricted_ast.Var(name=node.id)
 
 
+_BINARY_OPERATORS: dict[type[ast.operator], restricted_ast.BinOpKind] = {
+    ast.Add: restricted_ast.BinOpKind.ADD,
+    ast.Sub: restricted_ast.BinOpKind.SUB,
+    ast.Mult: restricted_ast.BinOpKind.MUL,
+    ast.FloorDiv: restricted_ast.BinOpKind.DIV,
+    ast.BitAnd: restricted_ast.BinOpKind.BIT_AND,
+    ast.BitOr: restricted_ast.BinOpKind.BIT_OR,
+    ast.BitXor: restricted_ast.BinOpKind.BIT_XOR,
+}
+
+_COMPARISON_OPERATORS: dict[type[ast.cmpop], restricted_ast.BinOpKind] = {
+    ast.Eq: restricted_ast.BinOpKind.EQ,
+    ast.NotEq: restricted_ast.BinOpKind.NOT_EQ,
+    ast.Lt: restricted_ast.BinOpKind.LT,
+    ast.LtE: restricted_ast.BinOpKind.LT_E,
+    ast.Gt: restricted_ast.BinOpKind.GT,
+    ast.GtE: restricted_ast.BinOpKind.GT_E,
+}
+
+_BOOLEAN_OPERATORS: dict[type[ast.boolop], restricted_ast.BinOpKind] = {
+    ast.And: restricted_ast.BinOpKind.AND,
+    ast.Or: restricted_ast.BinOpKind.OR,
+}
+
+_UNARY_OPERATORS: dict[type[ast.unaryop], restricted_ast.UnaryOpKind] = {
+    ast.USub: restricted_ast.UnaryOpKind.NEGATE,
+    ast.Not: restricted_ast.UnaryOpKind.NOT,
+}
+
+
 def _convert_binary_operator(op: ast.operator) -> Optional[restricted_ast.BinOpKind]:
-    TABLE: dict[type[ast.operator], restricted_ast.BinOpKind] = {
-        ast.Add: restricted_ast.BinOpKind.ADD,
-        ast.Sub: restricted_ast.BinOpKind.SUB,
-        ast.Mult: restricted_ast.BinOpKind.MUL,
-        ast.FloorDiv: restricted_ast.BinOpKind.DIV,
-        ast.BitAnd: restricted_ast.BinOpKind.BIT_AND,
-        ast.BitOr: restricted_ast.BinOpKind.BIT_OR,
-        ast.BitXor: restricted_ast.BinOpKind.BIT_XOR,
-    }
-    try:
-        return TABLE[type(op)]
-    except KeyError:
-        return None
+    return _BINARY_OPERATORS.get(type(op))
 
 
 def _convert_comparison_operator(op: ast.cmpop) -> Optional[restricted_ast.BinOpKind]:
-    TABLE: dict[type[ast.cmpop], restricted_ast.BinOpKind] = {
-        ast.Eq: restricted_ast.BinOpKind.EQ,
-        ast.NotEq: restricted_ast.BinOpKind.NOT_EQ,
-        ast.Lt: restricted_ast.BinOpKind.LT,
-        ast.LtE: restricted_ast.BinOpKind.LT_E,
-        ast.Gt: restricted_ast.BinOpKind.GT,
-        ast.GtE: restricted_ast.BinOpKind.GT_E,
-    }
-    try:
-        return TABLE[type(op)]
-    except KeyError:
-        return None
+    return _COMPARISON_OPERATORS.get(type(op))
 
 
 def _convert_boolean_operator(op: ast.boolop) -> Optional[restricted_ast.BinOpKind]:
-    TABLE: dict[type[ast.boolop], restricted_ast.BinOpKind] = {
-        ast.And: restricted_ast.BinOpKind.AND,
-        ast.Or: restricted_ast.BinOpKind.OR,
-    }
-    try:
-        return TABLE[type(op)]
-    except KeyError:
-        return None
+    return _BOOLEAN_OPERATORS.get(type(op))
 
 
 def _convert_unary_operator(op: ast.unaryop) -> Optional[restricted_ast.UnaryOpKind]:
-    TABLE: dict[type[ast.unaryop], restricted_ast.UnaryOpKind] = {
-        ast.USub: restricted_ast.UnaryOpKind.NEGATE,
-        ast.Not: restricted_ast.UnaryOpKind.NOT,
-    }
-    try:
-        return TABLE[type(op)]
-    except KeyError:
-        return None
+    return _UNARY_OPERATORS.get(type(op))
 
 
 class _ExpressionConverter(_StrictNodeVisitor):
@@ -236,10 +252,11 @@ class _ExpressionConverter(_StrictNodeVisitor):
         return restricted_ast.Var(name=node.id)
 
     def visit_Constant(self, node: ast.Constant) -> restricted_ast.Expression:
-        if type(node.value) == int:
-            return restricted_ast.Constant(value=node.value, datatype=DataType.INT)
-        elif type(node.value) == bool:
+        # `bool` is a subclass of `int`, so it must be checked first
+        if isinstance(node.value, bool):
             return restricted_ast.Constant(value=node.value, datatype=DataType.BOOL)
+        elif isinstance(node.value, int):
+            return restricted_ast.Constant(value=node.value, datatype=DataType.INT)
         else:
             self.raise_syntax_error(node, "Unsupported constant type")
 
@@ -247,29 +264,19 @@ class _ExpressionConverter(_StrictNodeVisitor):
         return _convert_subscript(self.source_code_info, node)
 
     def visit_List(self, node: ast.List) -> restricted_ast.Expression:
-        return restricted_ast.List(
-            items=[
-                _ExpressionConverter(self.source_code_info).visit(elt)
-                for elt in node.elts
-            ]
-        )
+        return restricted_ast.List(items=[self.visit(elt) for elt in node.elts])
 
     def visit_Tuple(self, node: ast.Tuple) -> restricted_ast.Expression:
-        return restricted_ast.Tuple(
-            items=[
-                _ExpressionConverter(self.source_code_info).visit(elt)
-                for elt in node.elts
-            ]
-        )
+        return restricted_ast.Tuple(items=[self.visit(elt) for elt in node.elts])
 
     def visit_BinOp(self, node: ast.BinOp) -> restricted_ast.Expression:
         operator = _convert_binary_operator(node.op)
         if operator is None:
             self.raise_syntax_error(node, "Unsupported binary operator")
         return restricted_ast.BinOp(
-            left=_ExpressionConverter(self.source_code_info).visit(node.left),
+            left=self.visit(node.left),
             operator=operator,
-            right=_ExpressionConverter(self.source_code_info).visit(node.right),
+            right=self.visit(node.right),
         )
 
     def visit_Compare(self, node: ast.Compare) -> restricted_ast.Expression:
@@ -285,29 +292,22 @@ class _ExpressionConverter(_StrictNodeVisitor):
         if operator is None:
             self.raise_syntax_error(node, "Unsupported comparison operator")
         return restricted_ast.BinOp(
-            left=_ExpressionConverter(self.source_code_info).visit(node.left),
+            left=self.visit(node.left),
             operator=operator,
-            right=_ExpressionConverter(self.source_code_info).visit(
-                node.comparators[0]
-            ),
+            right=self.visit(node.comparators[0]),
         )
 
     def visit_BoolOp(self, node: ast.BoolOp) -> restricted_ast.Expression:
         operator = _convert_boolean_operator(node.op)
         if operator is None:
             self.raise_syntax_error(node, "Unsupported boolean operator")
-        result = restricted_ast.BinOp(
-            left=_ExpressionConverter(self.source_code_info).visit(node.values[0]),
-            operator=operator,
-            right=_ExpressionConverter(self.source_code_info).visit(node.values[1]),
+        # Python guarantees at least two operands, so this is never a bare operand
+        return functools.reduce(
+            lambda left, right: restricted_ast.BinOp(
+                left=left, operator=operator, right=right
+            ),
+            [self.visit(operand) for operand in node.values],
         )
-        for operand in node.values[2:]:
-            result = restricted_ast.BinOp(
-                left=result,
-                operator=operator,
-                right=_ExpressionConverter(self.source_code_info).visit(operand),
-            )
-        return result
 
     def visit_UnaryOp(self, node: ast.UnaryOp) -> restricted_ast.Expression:
         operator = _convert_unary_operator(node.op)
@@ -315,18 +315,19 @@ class _ExpressionConverter(_StrictNodeVisitor):
             self.raise_syntax_error(node, "Unsupported unary operator")
         return restricted_ast.UnaryOp(
             operator=operator,
-            operand=_ExpressionConverter(self.source_code_info).visit(node.operand),
+            operand=self.visit(node.operand),
         )
 
 
 def _convert_statements(
     source_code_info: _SourceCodeInfo, statements: list[ast.stmt]
 ) -> list[restricted_ast.Statement]:
-    converted_statements: list[Optional[restricted_ast.Statement]] = [
-        _StatementConverter(source_code_info).visit(statement)
-        for statement in statements
+    statement_converter = _StatementConverter(source_code_info)
+    return [
+        converted
+        for converted in map(statement_converter.visit, statements)
+        if converted is not None
     ]
-    return [statement for statement in converted_statements if statement is not None]
 
 
 class _StatementConverter(_StrictNodeVisitor):
@@ -535,6 +536,15 @@ class _FunctionConverter(_StrictNodeVisitor):
         )
 
 
+def _get_root_call(func: ast.Call, main_name: str) -> Optional[ast.Call]:
+    assert isinstance(func.func, ast.Name)
+    if func.func.id == main_name:
+        return func
+    if len(func.args) != 1 or not isinstance(func.args[0], ast.Call):
+        return None
+    return _get_root_call(func.args[0], main_name)
+
+
 class _ModuleConverter(_StrictNodeVisitor):
     def error_message(self) -> str:
         return "Expected module"
@@ -551,27 +561,6 @@ class _ModuleConverter(_StrictNodeVisitor):
             raw_main_function
         )
 
-        def get_root_call(func: ast.Call) -> Optional[ast.Call]:
-            assert isinstance(func.func, ast.Name)
-            if func.func.id == main_function.name:
-                return func
-            if len(func.args) != 1 or not isinstance(func.args[0], ast.Call):
-                return None
-            return get_root_call(func.args[0])
-
-        def expr_to_constant(expr: ast.expr) -> Union[int, list[int]]:
-            if isinstance(expr, ast.Num) and isinstance(expr.n, int):
-                return expr.n
-            elif isinstance(expr, (ast.List, ast.Tuple)) and all(
-                isinstance(e, ast.Constant) and isinstance(e.value, int)
-                for e in expr.elts
-            ):
-                return [cast(ast.Constant, e).value for e in expr.elts]
-            else:
-                self.raise_syntax_error(
-                    expr, "Expected a constant integer or list of integers"
-                )
-
         # Collect arguments for function
         module_globals = {main_function.name: raw_main_function}
         for statement in node.body:
@@ -587,7 +576,7 @@ class _ModuleConverter(_StrictNodeVisitor):
             elif isinstance(statement, ast.Expr) and isinstance(
                 statement.value, ast.Call
             ):
-                call = get_root_call(statement.value)
+                call = _get_root_call(statement.value, main_function.name)
                 if call is None:
                     continue
 
@@ -76,20 +76,19 @@ def render_type(var_type: VarType, plaintext: Optional[bool] = None) -> str:
     return str_rep
 
 
-def render_datatype(datatype: DataType, plaintext: bool) -> str:
-    if datatype == DataType.INT:
-        if plaintext:
-            return "std::uint32_t"
-        else:
-            return "encrypto::motion::SecureUnsignedInteger"
+_CPP_DATATYPES: dict[tuple[DataType, bool], str] = {
+    (DataType.INT, True): "std::uint32_t",
+    (DataType.INT, False): "encrypto::motion::SecureUnsignedInteger",
+    (DataType.BOOL, True): "bool",
+    (DataType.BOOL, False): "encrypto::motion::ShareWrapper",
+}
 
-    elif datatype == DataType.BOOL:
-        if plaintext:
-            return "bool"
-        else:
-            return "encrypto::motion::ShareWrapper"
 
-    raise NotImplementedError(f"Unsupported datatype: {datatype}")
+def render_datatype(datatype: DataType, plaintext: bool) -> str:
+    try:
+        return _CPP_DATATYPES[(datatype, plaintext)]
+    except KeyError:
+        raise NotImplementedError(f"Unsupported datatype: {datatype}") from None
 
 
 def render_param(param: Parameter, type_env: TypeEnv) -> str:
@@ -436,20 +435,20 @@ def render_stmt(
     return assert_never(stmt)
 
 
-def _render_operator(op: Union[BinOpKind, UnaryOpKind]) -> str:
-    if op == BinOpKind.AND:
-        return "&"
-
-    if op == BinOpKind.OR:
-        return "|"
+# C++ spelling of every operator; operators not overridden here are spelled the
+# same as in Python.
+_CPP_OPERATORS: dict[Union[BinOpKind, UnaryOpKind], str] = {
+    **{op: op.value for op in BinOpKind},
+    **{op: op.value for op in UnaryOpKind},
+    BinOpKind.AND: "&",
+    BinOpKind.OR: "|",
+    BinOpKind.DIV: "/",
+    UnaryOpKind.NOT: "~",
+}
 
-    if op == BinOpKind.DIV:
-        return "/"
 
-    if op == UnaryOpKind.NOT:
-        return "~"
-
-    return str(op)
+def _render_operator(op: Union[BinOpKind, UnaryOpKind]) -> str:
+    return _CPP_OPERATORS[op]
 
 
 def render_expr(expr: Union[AssignRHS, SubscriptIndex], ctx: RenderContext) -> str:
@@ -2,9 +2,7 @@ from collections import defaultdict
 from typing import Union
 from dataclasses import dataclass
 
-import networkx  # type: ignore
-
-from .util import assert_never
+from .util import assert_never, dominance_frontiers
 from . import ssa
 
 
@@ -22,18 +20,8 @@ def _accessed_vars(s: _StatementBlock) -> list[ssa.Var]:
         return s.statement.rhs_vars()
     elif isinstance(s.statement, ssa.Assign):
         return ssa.assign_rhs_accessed_vars(s.statement.rhs)
-    elif isinstance(s.statement, ssa.Jump):
-        return []
-    elif isinstance(s.statement, ssa.ConditionalJump):
-        return [s.statement.condition]
-    elif isinstance(s.statement, ssa.For):
-        low = ssa.assign_rhs_accessed_vars(s.statement.bound_low)
-        high = ssa.assign_rhs_accessed_vars(s.statement.bound_high)
-        return low + high
-    elif isinstance(s.statement, ssa.Return):
-        return [s.statement.value]
     else:
-        assert_never(s.statement)
+        return ssa.terminator_accessed_vars(s.statement)
 
 
 def _compute_statements_setting_vars(
@@ -85,9 +73,7 @@ def _last(b: ssa.Block) -> _StatementBlock:
 
 def dead_code_elim(function: ssa.Function) -> None:
     statements_setting_vars = _compute_statements_setting_vars(function)
-    cd_1: dict[ssa.Block, set[ssa.Block]] = networkx.algorithms.dominance_frontiers(
-        G=function.body.reverse(), start=function.exit_block
-    )
+    cd_1 = dominance_frontiers(function.body.reverse(copy=False), function.exit_block)
     block: ssa.Block
 
     assert function.exit_block.terminator is not None
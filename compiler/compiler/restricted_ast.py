@@ -114,11 +114,11 @@ class Tuple:
 
 
 class BinOp(_BinOp[Expression]):
-    pass
+    __slots__ = ()
 
 
 class UnaryOp(_UnaryOp[Expression]):
-    pass
+    __slots__ = ()
 
 
 AssignLHS = Union[Var, Subscript]
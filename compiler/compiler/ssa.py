@@ -3,8 +3,6 @@
 from dataclasses import dataclass
 from typing import Union
 
-import networkx  # type: ignore
-
 from .ast_shared import (
     Var,
     Constant,
@@ -35,9 +33,10 @@ from .tac_cfg import (
     Update,
     VectorizedUpdate,
     assign_rhs_accessed_vars,
+    terminator_accessed_vars,
 )
 from .tac_cfg import Block as _BaseBlock
-from .util import assert_never
+from .util import assert_never, immediate_dominators
 
 
 @dataclass(eq=False)
@@ -90,11 +89,7 @@ class Block(_BaseBlock):
 
 class Function(_CFGFunction[Block]):
     def compute_dominance_tree(self) -> dict[Block, list[Block]]:
-        dominance_tree_dict: dict[
-            Block, Block
-        ] = networkx.algorithms.immediate_dominators(
-            G=self.body, start=self.entry_block
-        )
+        dominance_tree_dict = immediate_dominators(self.body, self.entry_block)
 
         result: dict[Block, list[Block]] = {block: [] for block in self.body.nodes}
 
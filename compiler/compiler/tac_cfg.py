@@ -32,11 +32,11 @@ Operand = Union[Atom, Subscript, "BinOp", "UnaryOp"]
 
 
 class BinOp(_BinOp[Operand]):
-    pass
+    __slots__ = ()
 
 
 class UnaryOp(_UnaryOp[Operand]):
-    pass
+    __slots__ = ()
 
 
 @dataclass
@@ -235,6 +235,21 @@ class Return:
 BlockTerminator = Union[Jump, ConditionalJump, For, Return]
 
 
+def terminator_accessed_vars(terminator: BlockTerminator) -> list[Var]:
+    if isinstance(terminator, Jump):
+        return []
+    elif isinstance(terminator, ConditionalJump):
+        return [terminator.condition]
+    elif isinstance(terminator, For):
+        return assign_rhs_accessed_vars(
+            terminator.bound_low
+        ) + assign_rhs_accessed_vars(terminator.bound_high)
+    elif isinstance(terminator, Return):
+        return [terminator.value]
+    else:
+        assert_never(terminator)
+
+
 @dataclass(eq=False)
 class Block:
     assignments: list[Assign]
@@ -3,7 +3,6 @@ Tools for converting from a three-address code control flow graph
 to static single assignment form
 """
 
-from collections import Counter
 import itertools
 from typing import Optional, Union, cast
 
@@ -13,45 +12,24 @@ from compiler.ast_shared import VectorizedAccess  # type: ignore
 
 from . import tac_cfg
 from . import ssa
-from .util import assert_never
+from .util import assert_never, dominance_frontiers
 
 
-def _compute_blocks_setting_vars(
-    function: ssa.Function, include_loop_counters: bool
-) -> dict[ssa.Var, set[ssa.Block]]:
-
-    result: dict[ssa.Var, set[ssa.Block]] = dict()
-
-    block: ssa.Block
-    for block in function.body.nodes:
-        term = block.terminator
-        lhss = [a.lhs for a in block.assignments] + (
-            [term.counter]
-            if include_loop_counters and isinstance(term, ssa.For)
-            else []
-        )
-        for var in lhss:
-            assert isinstance(
-                var, ssa.Var
-            ), "VectorizedAccesses are not added until basic vectorization"
-            if var not in result:
-                result[var] = set()
-
-            result[var].add(block)
-
-    return result
-
-
-def _tac_cfg_to_ssa_struct(tac_cfg_function: tac_cfg.Function) -> ssa.Function:
+def _tac_cfg_to_ssa_struct(
+    tac_cfg_function: tac_cfg.Function,
+) -> tuple[ssa.Function, dict[ssa.Var, list[ssa.Block]]]:
     """
     Convert a `tac_cfg.Function` to an `ssa.Function` without
     trying to enforce any SSA properties.
     The output has no Phi-functions and may assign
     to the same variable multiple times.
+
+    Also returns a map from each variable to the blocks that assign to it.
+    Loop counters (set by `For` terminators) are not included.
     """
 
-    cfg = networkx.DiGraph()
     mapping: dict[tac_cfg.Block, ssa.Block] = dict()
+    blocks_setting_vars: dict[ssa.Var, list[ssa.Block]] = dict()
 
     tac_cfg_block: tac_cfg.Block
     for tac_cfg_block in tac_cfg_function.body.nodes:
@@ -61,21 +39,22 @@ def _tac_cfg_to_ssa_struct(tac_cfg_function: tac_cfg.Function) -> ssa.Function:
             terminator=tac_cfg_block.terminator,
             merge_condition=tac_cfg_block.merge_condition,
         )
-        cfg.add_node(ssa_block)
         mapping[tac_cfg_block] = ssa_block
 
-    source_block: tac_cfg.Block
-    dest_block: tac_cfg.Block
-    label: ssa.BranchKind
-    for source_block, dest_block, edge_data in tac_cfg_function.body.edges(data=True):
-        cfg.add_edge(
-            u_of_edge=mapping[source_block],
-            v_of_edge=mapping[dest_block],
-            label=edge_data["label"],
-            ident=edge_data["ident"],
-        )
+        for a in ssa_block.assignments:
+            var = a.lhs
+            assert isinstance(
+                var, ssa.Var
+            ), "VectorizedAccesses are not added until basic vectorization"
+            blocks = blocks_setting_vars.setdefault(var, [])
+            # Blocks are visited one at a time, so duplicates are adjacent
+            if blocks == [] or blocks[-1] is not ssa_block:
+                blocks.append(ssa_block)
+
+    # The CFG keeps the same shape and edge data (`label` and `ident`)
+    cfg = networkx.relabel_nodes(tac_cfg_function.body, mapping, copy=True)
 
-    return ssa.Function(
+    function = ssa.Function(
         name=tac_cfg_function.name,
         parameters=tac_cfg_function.parameters,
         body=cfg,
@@ -83,59 +62,105 @@ def _tac_cfg_to_ssa_struct(tac_cfg_function: tac_cfg.Function) -> ssa.Function:
         exit_block=mapping[tac_cfg_function.exit_block],
         return_type=tac_cfg_function.return_type,
     )
+    return function, blocks_setting_vars
 
 
-def place_phi_functions(result: ssa.Function) -> None:
-    dominance_frontiers: dict[
-        ssa.Block, set[ssa.Block]
-    ] = networkx.algorithms.dominance_frontiers(G=result.body, start=result.entry_block)
+def _compute_nonlocal_vars(function: ssa.Function) -> set[ssa.Var]:
+    """
+    Compute the variables that may be read in a block
+    before that block assigns to them,
+    i.e. the only variables whose values can flow between blocks.
+    Variables outside this set never need phi-functions
+    (this is "semi-pruned" SSA form).
+    """
 
-    blocks_setting_vars = _compute_blocks_setting_vars(
-        function=result, include_loop_counters=False
-    )
+    result: set[ssa.Var] = set()
+
+    block: ssa.Block
+    for block in function.body.nodes:
+        assigned: set[ssa.Var] = set()
+        for a in block.assignments:
+            result.update(
+                var
+                for var in ssa.assign_rhs_accessed_vars(a.rhs)
+                if var not in assigned
+            )
+            assert isinstance(
+                a.lhs, ssa.Var
+            ), "VectorizedAccesses are not added until basic vectorization"
+            assigned.add(a.lhs)
+
+        assert block.terminator is not None
+        result.update(
+            var
+            for var in ssa.terminator_accessed_vars(block.terminator)
+            if var not in assigned
+        )
+
+    return result
+
+
+def place_phi_functions(
+    result: ssa.Function,
+    blocks_setting_vars: dict[ssa.Var, list[ssa.Block]],
+    nonlocal_vars: set[ssa.Var],
+) -> None:
+    frontiers = dominance_frontiers(result.body, result.entry_block)
+
+    blocks: list[ssa.Block] = list(result.body.nodes)
+    block_ids = {block: i for i, block in enumerate(blocks)}
+    frontier_ids = [[block_ids[Y] for Y in frontiers[X]] for X in blocks]
 
     iter_count = 0
-    has_already: Counter[ssa.Block] = Counter()
-    work: Counter[ssa.Block] = Counter()
-    W: set[ssa.Block] = set()
+    has_already = [0] * len(blocks)
+    work = [0] * len(blocks)
+    W: list[int] = []
 
     for V in blocks_setting_vars.keys():
+        if V not in nonlocal_vars:
+            continue
+
         iter_count += 1
 
         for X in blocks_setting_vars[V]:
-            work[X] = iter_count
-            W.add(X)
-
-        while W != set():
-            X = W.pop()
-            Y: ssa.Block
-            for Y in dominance_frontiers[X]:
-                if has_already[Y] < iter_count:
-                    num_predecessors = sum(1 for _ in result.body.predecessors(Y))
-                    assert num_predecessors == 2
+            work[block_ids[X]] = iter_count
+            W.append(block_ids[X])
+
+        while W:
+            for y in frontier_ids[W.pop()]:
+                if has_already[y] < iter_count:
+                    Y = blocks[y]
+                    assert result.body.in_degree(Y) == 2
                     Y.phi_functions.append(ssa.Phi(lhs=V, rhs_false=V, rhs_true=V))
-                    has_already[Y] = iter_count
-                    if work[Y] < iter_count:
-                        work[Y] = iter_count
-                        W.add(Y)
+                    has_already[y] = iter_count
+                    if work[y] < iter_count:
+                        work[y] = iter_count
+                        W.append(y)
 
 
-def rename_variables(result: ssa.Function) -> None:
+def rename_variables(
+    result: ssa.Function, blocks_setting_vars: dict[ssa.Var, list[ssa.Block]]
+) -> None:
     dominance_tree = result.compute_dominance_tree()
-    blocks_setting_vars = _compute_blocks_setting_vars(
-        function=result, include_loop_counters=True
-    )
-
-    S: dict[ssa.Var, list[int]] = dict()
+    loop_counters = [
+        block.terminator.counter
+        for block in result.body.nodes
+        if isinstance(block.terminator, ssa.For)
+    ]
+
+    # Current rename subscript of each variable, i.e. the top of Cytron's stack S.
+    # Rather than a stack per variable, each assignment logs the subscript it
+    # replaced in `undo_log`, which is unwound when leaving the assigning block.
+    S: dict[ssa.Var, int] = dict()
     C: dict[ssa.Var, int] = dict()
+    undo_log: list[tuple[ssa.Var, int]] = []
 
     param_vars = [param.var for param in result.parameters]
 
     def rename_var(V: ssa.Var, i: Optional[int] = None):
         if i is None:
-            try:
-                i = S[V][-1]
-            except KeyError:
+            i = S.get(V)
+            if i is None:
                 return V
 
         return ssa.Var(V.name, i)
@@ -236,78 +261,72 @@ def rename_variables(result: ssa.Function) -> None:
             ), "These types are introduced in the vectorization phase"
             assert_never(rhs)
 
-    def search(X: ssa.Block):
-        old_lhs: dict[Union[ssa.Phi, ssa.Assign, ssa.For], ssa.Var] = dict()
-
-        if (
-            isinstance(X.terminator, ssa.ConditionalJump)
-            or isinstance(X.terminator, ssa.For)
-            or isinstance(X.terminator, ssa.Return)
-        ):
-            var_terminators = [X.terminator]
-        elif isinstance(X.terminator, ssa.Jump):
-            var_terminators = []
+    # For each block X, its successors Y that have phi-functions,
+    # and whether X fills their `rhs_true` operands.
+    # That's the case when X is Y's second predecessor by edge creation.
+    phi_successors: dict[ssa.Block, list[tuple[ssa.Block, bool]]] = {
+        X: [] for X in result.body.nodes
+    }
+    for Y in result.body.nodes:
+        predecessors = sorted(
+            result.body.predecessors(Y),
+            key=lambda X: result.body.edges[X, Y]["ident"],
+        )
+        assert len(predecessors) <= 2
+        if Y.phi_functions != []:
+            for i, X in enumerate(predecessors):
+                phi_successors[X].append((Y, i == 1))
+
+    # Gives the variable assigned by `A` a fresh rename subscript.
+    # Loop counters are never restored, so they aren't logged in `undo_log`.
+    def rename_lhs(A: Union[ssa.Phi, ssa.Assign, ssa.For]) -> None:
+        assert isinstance(
+            A.lhs, ssa.Var
+        ), "VectorizedAccesses are not added until basic vectorization"
+        V = A.lhs
+        i = C[V]
+        A.lhs = rename_var(V, i)
+        if not isinstance(A, ssa.For):
+            undo_log.append((V, S[V]))
+        S[V] = i
+        C[V] = i + 1
+
+    # Renames the variables in `X` and the phi-function operands of its successors,
+    # and returns the length of `undo_log` before `X` was renamed.
+    def search_enter(X: ssa.Block) -> int:
+        undo_mark = len(undo_log)
+
+        for phi in X.phi_functions:
+            rename_lhs(phi)
+
+        for assign in X.assignments:
+            assign.rhs = rename_rhs(assign.rhs)
+            rename_lhs(assign)
+
+        term = X.terminator
+        if isinstance(term, ssa.ConditionalJump):
+            term.condition = rename_var(term.condition)
+        elif isinstance(term, ssa.Return):
+            term.value = rename_var(term.value)
+        elif isinstance(term, ssa.For):
+            if isinstance(term.bound_low, ssa.Var):
+                term.bound_low = rename_var(term.bound_low)
+            if isinstance(term.bound_high, ssa.Var):
+                term.bound_high = rename_var(term.bound_high)
+            rename_lhs(term)
+        elif isinstance(term, ssa.Jump):
+            pass
         else:
-            assert X.terminator is not None
-            assert_never(X.terminator)
-
-        # Required for type checker
-        empty1: list[
-            Union[ssa.Phi, ssa.Assign, ssa.ConditionalJump, ssa.For, ssa.Return]
-        ] = []
-        for A in (
-            empty1
-            + [a for a in X.phi_functions]
-            + [a for a in X.assignments]
-            + [a for a in var_terminators]
-        ):
-            if isinstance(A, ssa.Assign):
-                A.rhs = rename_rhs(A.rhs)
-            elif isinstance(A, ssa.ConditionalJump):
-                A.condition = rename_var(A.condition)
-            elif isinstance(A, ssa.Return):
-                A.value = rename_var(A.value)
-            elif isinstance(A, ssa.For):
-                if isinstance(A.bound_low, ssa.Var):
-                    A.bound_low = rename_var(A.bound_low)
-                if isinstance(A.bound_high, ssa.Var):
-                    A.bound_high = rename_var(A.bound_high)
-            elif isinstance(A, ssa.Phi):
-                pass
-            else:
-                assert_never(A)
-
-            if isinstance(A, (ssa.Phi, ssa.Assign, ssa.For)):
-                assert isinstance(
-                    A.lhs, ssa.Var
-                ), "VectorizedAccesses are not added until basic vectorization"
-                V = A.lhs
-                i = C[V]
-                old_lhs[A] = A.lhs
-                A.lhs = rename_var(V, i)
-                S[V].append(i)
-                C[V] = i + 1
-
-        Y: ssa.Block
-        for Y in result.body.successors(X):
-            assert len(list(result.body.predecessors(Y))) in (1, 2)
-            j = [
-                i
-                for i, predecessor in enumerate(
-                    sorted(
-                        result.body.predecessors(Y),
-                        key=lambda X_: result.body.edges[X_, Y]["ident"],
-                    )
-                )
-                if predecessor == X
-            ][0]
+            assert term is not None
+            assert_never(term)
+
+        for Y, phi_branch_true in phi_successors[X]:
             for F in Y.phi_functions:
-                phi_branch_true = {0: False, 1: True}[j]
                 assert isinstance(F.rhs_false, ssa.Var) and isinstance(
                     F.rhs_true, ssa.Var
                 ), "VectorizedAccesses are not added until basic vectorization"
                 V = F.rhs_true if phi_branch_true else F.rhs_false
-                i = S[V][-1]
+                i = S[V]
                 if isinstance(V, ssa.Subscript):
                     pass  # TODO: Support this
                 elif isinstance(V, ssa.Var):
@@ -318,13 +337,14 @@ def rename_variables(result: ssa.Function) -> None:
                 else:
                     assert_never(V)
 
-        for Y in dominance_tree[X]:
-            search(Y)
+        return undo_mark
 
-        empty2: list[Union[ssa.Phi, ssa.Assign]] = []  # Required for type checker
-        for A in empty2 + [a for a in X.phi_functions] + [a for a in X.assignments]:
-            V = old_lhs[A]
-            S[V].pop()
+    # Undoes the rename subscript changes made since `undo_mark`
+    # once all blocks dominated by the block that returned it have been searched.
+    def search_leave(undo_mark: int) -> None:
+        while len(undo_log) > undo_mark:
+            V, i = undo_log.pop()
+            S[V] = i
 
     # In Cytron's SSA paper,
     # all variables V with rename subscript zero (V₀) are assumed to be initialized
@@ -342,19 +362,35 @@ def rename_variables(result: ssa.Function) -> None:
     # parameters are renamed to have a zero subscript.
 
     # Assume all variables V have an initial value V₀.
-    for V in itertools.chain(param_vars, blocks_setting_vars.keys()):
-        C[V] = 1
-        S[V] = [0]
+    # The same variable can be a parameter, assigned, and a loop counter,
+    # so this deduplicates them first.
+    all_vars = dict.fromkeys(
+        itertools.chain(param_vars, blocks_setting_vars.keys(), loop_counters)
+    )
+    C.update(dict.fromkeys(all_vars, 1))
+    S.update(dict.fromkeys(all_vars, 0))
 
     # Rename all parameters V to V₀.
     for param in result.parameters:
         param.var = rename_var(param.var, 0)
 
-    search(result.entry_block)
+    # Preorder walk of the dominance tree, using an explicit stack rather than
+    # recursion so deep dominance trees don't hit Python's recursion limit.
+    # Each block is pushed a second time with its undo mark so that
+    # `search_leave` runs after all of its children have been searched.
+    stack: list[tuple[ssa.Block, Optional[int]]] = [(result.entry_block, None)]
+    while stack:
+        X, undo_mark = stack.pop()
+        if undo_mark is None:
+            stack.append((X, search_enter(X)))
+            stack.extend((Y, None) for Y in reversed(dominance_tree[X]))
+        else:
+            search_leave(undo_mark)
 
 
 def tac_cfg_to_ssa(tac_cfg_function: tac_cfg.Function) -> ssa.Function:
-    result = _tac_cfg_to_ssa_struct(tac_cfg_function)
-    place_phi_functions(result)
-    rename_variables(result)
+    # Phi-functions don't affect `blocks_setting_vars`, so it's shared by both passes
+    result, blocks_setting_vars = _tac_cfg_to_ssa_struct(tac_cfg_function)
+    place_phi_functions(result, blocks_setting_vars, _compute_nonlocal_vars(result))
+    rename_variables(result, blocks_setting_vars)
     return result
@@ -55,3 +55,80 @@ def partially_ordered_sort(elems: list[E], ordering: Callable[[E, E], int]) -> l
                 graph.add_edge(e2, e1)
 
     return list(networkx.topological_sort(graph))
+
+
+# Reverse postorder of the nodes reachable from `start`,
+# the predecessors of each node and its immediate dominator,
+# all as indices into that order,
+# using Cooper, Harvey, and Kennedy's "A Simple, Fast Dominance Algorithm"
+def _dominance_indices(
+    graph: networkx.DiGraph, start: E
+) -> tuple[list[E], list[list[int]], list[int]]:
+    postorder: list[E] = []
+    visited = {start}
+    stack = [(start, iter(graph.succ[start]))]
+    while stack:
+        node, successors = stack[-1]
+        for successor in successors:
+            if successor not in visited:
+                visited.add(successor)
+                stack.append((successor, iter(graph.succ[successor])))
+                break
+        else:
+            stack.pop()
+            postorder.append(node)
+
+    order = postorder[::-1]
+    index = {node: i for i, node in enumerate(order)}
+    predecessors = [
+        [index[pred] for pred in graph.pred[node] if pred in index] for node in order
+    ]
+
+    # Unprocessed nodes have -1. Dominators always have a smaller index.
+    idom = [-1] * len(order)
+    idom[0] = 0
+    changed = True
+    while changed:
+        changed = False
+        for i in range(1, len(order)):
+            new_idom = -1
+            for pred in predecessors[i]:
+                if idom[pred] == -1:
+                    continue
+                if new_idom == -1:
+                    new_idom = pred
+                    continue
+                while pred != new_idom:
+                    while pred > new_idom:
+                        pred = idom[pred]
+                    while new_idom > pred:
+                        new_idom = idom[new_idom]
+            if idom[i] != new_idom:
+                idom[i] = new_idom
+                changed = True
+
+    return order, predecessors, idom
+
+
+# Immediate dominator of each node reachable from `start`, with `start` mapped to
+# itself. The result has the same contents and key order as
+# `networkx.algorithms.immediate_dominators`.
+def immediate_dominators(graph: networkx.DiGraph, start: E) -> dict[E, E]:
+    order, _, idom = _dominance_indices(graph, start)
+    return {node: order[idom[i]] for i, node in enumerate(order)}
+
+
+# Dominance frontier of each node reachable from `start`. The result has the
+# same contents as `networkx.algorithms.dominance_frontiers`.
+def dominance_frontiers(graph: networkx.DiGraph, start: E) -> dict[E, set[E]]:
+    order, predecessors, idom = _dominance_indices(graph, start)
+    frontiers: list[set[E]] = [set() for _ in order]
+    for i, node in enumerate(order):
+        # Like networkx, this counts unreachable predecessors too
+        if len(graph.pred[node]) < 2:
+            continue
+        for runner in predecessors[i]:
+            while runner != idom[i]:
+                frontiers[runner].add(node)
+                runner = idom[runner]
+    return dict(zip(order, frontiers))
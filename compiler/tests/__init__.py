@@ -2,6 +2,7 @@ import sys
 import unittest
 
 from .test_stages import StagesTestCase, regenerate_stages
+from .test_util import DominanceTestCase
 
 def run_tests():
     unittest.main(module=__name__, argv=sys.argv[:1])
@@ -1,4 +1,5 @@
 import ast
+from concurrent.futures import Future, ProcessPoolExecutor
 import os
 import sys
 import subprocess
@@ -11,79 +12,112 @@ from . import context as test_context
 from .backends.motion.benchmark import run_benchmark
 
 
-class StagesTestCase(unittest.TestCase):
-    maxDiff = None
+def _compile_stages(input_text: str) -> dict[str, str]:
+    """
+    Compile the benchmark source `input_text`,
+    returning the output of each stage keyed by its file name, in pipeline order
+    """
 
-    def test_stages(self):
-        if test_context.BACKEND:
-            self.skipTest("Only verifying output of example applications")
+    stages: dict[str, str] = dict()
 
-        for test_case_dir in os.scandir(test_context.STAGES_DIR):
-            if test_case_dir.name in test_context.SKIPPED_TESTS:
-                continue
+    node = ast.parse(input_text)
+
+    node = compiler.ast_to_restricted_ast(node, "input.py", input_text)
+    stages["restricted_ast.py"] = str(node)
 
-            print(f"Testing {test_case_dir.name}...")
+    cfg = compiler.restricted_ast_to_tac_cfg(node)
+    stages["tac_cfg.txt"] = str(cfg)
 
-            stages = dict()
+    ssa = compiler.tac_cfg_to_ssa(cfg)
+    stages["ssa.txt"] = str(ssa)
 
-            for stage_file in os.scandir(test_case_dir.path):
-                if stage_file.is_file():
-                    with open(stage_file.path, "r") as f:
-                        stages[stage_file.name] = f.read().strip()
+    compiler.replace_phi_with_mux(ssa)
+    stages["ssa_mux.txt"] = str(ssa)
 
-            node = ast.parse(stages["input.py"])
+    compiler.dead_code_elim(ssa)
+    stages["dead_code_elim.txt"] = str(ssa)
 
-            node = compiler.ast_to_restricted_ast(node, "input.py", stages["input.py"])
-            self.assertEqual(str(node), stages["restricted_ast.py"])
+    loop_linear = compiler.ssa_to_loop_linear_code(ssa)
+    stages["loop_linear.txt"] = str(loop_linear)
 
-            cfg = compiler.restricted_ast_to_tac_cfg(node)
-            self.assertEqual(str(cfg), stages["tac_cfg.txt"])
+    dep_graph = compiler.DepGraph(loop_linear)
+    stages["dep_graph.txt"] = str(dep_graph)
 
-            ssa = compiler.tac_cfg_to_ssa(cfg)
-            self.assertEqual(str(ssa), stages["ssa.txt"])
+    compiler.vectorize.remove_infeasible_edges(loop_linear, dep_graph)
+    stages["dep_graph_remove_infeasible_edges.txt"] = str(dep_graph)
 
-            compiler.replace_phi_with_mux(ssa)
-            self.assertEqual(str(ssa), stages["ssa_mux.txt"])
+    (loop_linear, type_env) = compiler.type_check(loop_linear, dep_graph)
+    stages["unvectorized_linear.txt"] = str(loop_linear)
+    stages["unvectorized_type_env.txt"] = str(type_env)
 
-            compiler.dead_code_elim(ssa)
-            self.assertEqual(str(ssa), stages["dead_code_elim.txt"])
+    (loop_linear, dep_graph) = compiler.vectorize.basic_vectorization_phase_1(
+        loop_linear, type_env
+    )
+    stages["bv_phase_1.txt"] = str(loop_linear)
+    stages["bv_phase_1_dep_graph.txt"] = str(dep_graph)
 
-            loop_linear = compiler.ssa_to_loop_linear_code(ssa)
-            self.assertEqual(str(loop_linear), stages["loop_linear.txt"])
+    (
+        loop_linear,
+        dep_graph,
+    ) = compiler.vectorize.basic_vectorization_phase_2(loop_linear)
+    stages["bv_phase_2.txt"] = str(loop_linear)
+    stages["bv_phase_2_dep_graph.txt"] = str(dep_graph)
 
-            dep_graph = compiler.DepGraph(loop_linear)
-            self.assertEqual(str(dep_graph), stages["dep_graph.txt"])
+    (loop_linear, type_env) = compiler.type_check(loop_linear, dep_graph)
+    stages["vectorized_linear.txt"] = str(loop_linear)
+    stages["vectorized_type_env.txt"] = str(type_env)
 
-            compiler.vectorize.remove_infeasible_edges(loop_linear, dep_graph)
-            self.assertEqual(
-                str(dep_graph), stages["dep_graph_remove_infeasible_edges.txt"]
-            )
+    motion_code = compiler.backends.motion.render_function(loop_linear, type_env, True)
+    stages["motion_code.txt"] = str(motion_code)
 
-            (loop_linear, type_env) = compiler.type_check(loop_linear, dep_graph)
-            self.assertEqual(str(loop_linear), stages["unvectorized_linear.txt"])
-            self.assertEqual(str(type_env), stages["unvectorized_type_env.txt"])
+    return stages
+
+
+def _stage_test_cases() -> list[tuple[os.DirEntry, str]]:
+    """Get each non-skipped stage test case directory with its input source"""
+
+    test_cases = []
+    for test_case_dir in os.scandir(test_context.STAGES_DIR):
+        if test_case_dir.name in test_context.SKIPPED_TESTS:
+            continue
+
+        with open(os.path.join(test_case_dir, "input.py"), "r") as f:
+            test_cases.append((test_case_dir, f.read()))
 
-            (loop_linear, dep_graph) = compiler.vectorize.basic_vectorization_phase_1(
-                loop_linear, type_env
-            )
-            self.assertEqual(str(loop_linear), stages["bv_phase_1.txt"])
-            self.assertEqual(str(dep_graph), stages["bv_phase_1_dep_graph.txt"])
+    return test_cases
 
-            (
-                loop_linear,
-                dep_graph,
-            ) = compiler.vectorize.basic_vectorization_phase_2(loop_linear)
-            self.assertEqual(str(loop_linear), stages["bv_phase_2.txt"])
-            self.assertEqual(str(dep_graph), stages["bv_phase_2_dep_graph.txt"])
 
-            (loop_linear, type_env) = compiler.type_check(loop_linear, dep_graph)
-            self.assertEqual(str(loop_linear), stages["vectorized_linear.txt"])
-            self.assertEqual(str(type_env), stages["vectorized_type_env.txt"])
+def _submit_stage_test_cases(
+    executor: ProcessPoolExecutor,
+) -> list[tuple[os.DirEntry, "Future[dict[str, str]]"]]:
+    """Start compiling each stage test case, pairing its directory with its stages"""
 
-            motion_code = compiler.backends.motion.render_function(
-                loop_linear, type_env, True
-            )
-            self.assertEqual(str(motion_code), stages["motion_code.txt"])
+    return [
+        (test_case_dir, executor.submit(_compile_stages, input_text))
+        for test_case_dir, input_text in _stage_test_cases()
+    ]
+
+
+class StagesTestCase(unittest.TestCase):
+    maxDiff = None
+
+    def test_stages(self):
+        if test_context.BACKEND:
+            self.skipTest("Only verifying output of example applications")
+
+        # Test cases are independent, so compile them in parallel
+        with ProcessPoolExecutor() as executor:
+            for test_case_dir, future in _submit_stage_test_cases(executor):
+                print(f"Testing {test_case_dir.name}...")
+
+                with self.subTest(case=test_case_dir.name):
+                    stages = future.result()
+
+                    for stage_name, output in stages.items():
+                        with self.subTest(stage=stage_name), open(
+                            os.path.join(test_case_dir, stage_name), "r"
+                        ) as f:
+                            self.assertEqual(output, f.read().strip())
 
     def test_example_apps(self):
         if test_context.BACKEND is None:
@@ -115,81 +149,17 @@ class StagesTestCase(unittest.TestCase):
 
 
 def regenerate_stages():
-    for test_case_dir in os.scandir(test_context.STAGES_DIR):
-        if test_case_dir.name in test_context.SKIPPED_TESTS:
-            continue
-
-        print(f"Regenerating {test_case_dir.name}...")
-        with open(os.path.join(test_case_dir, "input.py"), "r") as f:
-            input_text = f.read()
-
-        node = ast.parse(input_text)
-
-        node = compiler.ast_to_restricted_ast(node, "input.py", input_text)
-        with open(os.path.join(test_case_dir, "restricted_ast.py"), "w") as f:
-            f.write(f"{node}\n")
-
-        cfg = compiler.restricted_ast_to_tac_cfg(node)
-        with open(os.path.join(test_case_dir, "tac_cfg.txt"), "w") as f:
-            f.write(f"{cfg}\n")
-
-        ssa = compiler.tac_cfg_to_ssa(cfg)
-        with open(os.path.join(test_case_dir, "ssa.txt"), "w") as f:
-            f.write(f"{ssa}\n")
-
-        compiler.replace_phi_with_mux(ssa)
-        with open(os.path.join(test_case_dir, "ssa_mux.txt"), "w") as f:
-            f.write(f"{ssa}\n")
-
-        compiler.dead_code_elim(ssa)
-        with open(os.path.join(test_case_dir, "dead_code_elim.txt"), "w") as f:
-            f.write(f"{ssa}\n")
-
-        loop_linear = compiler.ssa_to_loop_linear_code(ssa)
-        with open(os.path.join(test_case_dir, "loop_linear.txt"), "w") as f:
-            f.write(f"{loop_linear}\n")
-
-        dep_graph = compiler.DepGraph(loop_linear)
-        with open(os.path.join(test_case_dir, "dep_graph.txt"), "w") as f:
-            f.write(f"{dep_graph}\n")
-
-        compiler.vectorize.remove_infeasible_edges(loop_linear, dep_graph)
-        with open(
-            os.path.join(test_case_dir, "dep_graph_remove_infeasible_edges.txt"), "w"
-        ) as f:
-            f.write(f"{dep_graph}\n")
-
-        (loop_linear, type_env) = compiler.type_check(loop_linear, dep_graph)
-        with open(os.path.join(test_case_dir, "unvectorized_linear.txt"), "w") as f:
-            f.write(f"{loop_linear}\n")
-        with open(os.path.join(test_case_dir, "unvectorized_type_env.txt"), "w") as f:
-            f.write(f"{type_env}\n")
-
-        (loop_linear, dep_graph) = compiler.vectorize.basic_vectorization_phase_1(
-            loop_linear, type_env
-        )
-        with open(os.path.join(test_case_dir, "bv_phase_1.txt"), "w") as f:
-            f.write(f"{loop_linear}\n")
-        with open(os.path.join(test_case_dir, "bv_phase_1_dep_graph.txt"), "w") as f:
-            f.write(f"{dep_graph}\n")
-
-        (
-            loop_linear,
-            dep_graph,
-        ) = compiler.vectorize.basic_vectorization_phase_2(loop_linear)
-        with open(os.path.join(test_case_dir, "bv_phase_2.txt"), "w") as f:
-            f.write(f"{loop_linear}\n")
-        with open(os.path.join(test_case_dir, "bv_phase_2_dep_graph.txt"), "w") as f:
-            f.write(f"{dep_graph}\n")
-
-        (loop_linear, type_env) = compiler.type_check(loop_linear, dep_graph)
-        with open(os.path.join(test_case_dir, "vectorized_linear.txt"), "w") as f:
-            f.write(f"{loop_linear}\n")
-        with open(os.path.join(test_case_dir, "vectorized_type_env.txt"), "w") as f:
-            f.write(f"{type_env}\n")
-
-        motion_code = compiler.backends.motion.render_function(
-            loop_linear, type_env, True
-        )
-        with open(os.path.join(test_case_dir, "motion_code.txt"), "w") as f:
-            f.write(f"{motion_code}\n")
+    with ProcessPoolExecutor() as executor:
+        for test_case_dir, future in _submit_stage_test_cases(executor):
+            print(f"Regenerating {test_case_dir.name}...")
+
+            try:
+                stages = future.result()
+            except Exception as e:
+                raise RuntimeError(
+                    f"Failed to compile stages of {test_case_dir.name}"
+                ) from e
+
+            for stage_name, output in stages.items():
+                with open(os.path.join(test_case_dir, stage_name), "w") as f:
+                    f.write(f"{output}\n")
@@ -0,0 +1,85 @@
+import random
+import unittest
+
+import networkx  # type: ignore
+
+from compiler.util import dominance_frontiers, immediate_dominators
+
+# Graphs with an unreachable node, self-loops, and several back edges
+EDGE_LISTS: list[list[tuple[int, int]]] = [
+    [(0, 1), (0, 2), (1, 3), (2, 3)],
+    [(0, 1), (1, 2), (2, 1), (2, 3), (3, 1), (3, 4)],
+    [(0, 1), (1, 1), (1, 2), (2, 2), (2, 0)],
+    [(0, 1), (1, 2), (2, 3), (3, 2), (3, 1), (1, 4), (5, 2), (5, 5)],
+    [(1, 1), (1, 0), (2, 0), (2, 2), (0, 2)],
+    # Join node 3 with unreachable predecessor 9 when starting from 0
+    [(0, 1), (0, 2), (1, 3), (2, 3), (9, 3)],
+    # Join node 1 with only one reachable predecessor when starting from 0
+    [(0, 1), (1, 2), (2, 3), (9, 1)],
+]
+
+
+def _random_graph(rng: random.Random) -> tuple[networkx.DiGraph, int]:
+    n = rng.randint(1, 15)
+    nodes = list(range(n))
+    rng.shuffle(nodes)
+
+    graph = networkx.DiGraph()
+    graph.add_nodes_from(nodes)
+    for _ in range(rng.randint(0, 3 * n)):
+        graph.add_edge(rng.randrange(n), rng.randrange(n))
+
+    return graph, rng.randrange(n)
+
+
+class DominanceTestCase(unittest.TestCase):
+    def assert_same_idoms(self, graph: networkx.DiGraph, start: int) -> None:
+        # Key order determines the dominance tree's child order
+        self.assertEqual(
+            list(immediate_dominators(graph, start).items()),
+            list(networkx.immediate_dominators(graph, start).items()),
+        )
+
+    def assert_same_frontiers(self, graph: networkx.DiGraph, start: int) -> None:
+        self.assertEqual(
+            list(dominance_frontiers(graph, start).items()),
+            list(networkx.dominance_frontiers(graph, start).items()),
+        )
+
+    def test_immediate_dominators(self):
+        for edges in EDGE_LISTS:
+            graph = networkx.DiGraph(edges)
+            for start in graph.nodes:
+                with self.subTest(edges=edges, start=start):
+                    self.assert_same_idoms(graph, start)
+                    self.assert_same_idoms(graph.reverse(copy=False), start)
+
+    def test_immediate_dominators_random(self):
+        rng = random.Random(0)
+        for _ in range(2000):
+            graph, start = _random_graph(rng)
+            with self.subTest(edges=list(graph.edges), start=start):
+                self.assert_same_idoms(graph, start)
+                self.assert_same_idoms(graph.reverse(copy=False), start)
+
+    def test_dominance_frontiers(self):
+        for edges in EDGE_LISTS:
+            graph = networkx.DiGraph(edges)
+            for start in graph.nodes:
+                with self.subTest(edges=edges, start=start):
+                    self.assert_same_frontiers(graph, start)
+                    self.assert_same_frontiers(graph.reverse(copy=False), start)
+
+    def test_dominance_frontiers_unreachable_predecessor(self):
+        graph = networkx.DiGraph([(0, 1), (0, 2), (1, 3), (2, 3), (9, 3)])
+        self.assertEqual(
+            dominance_frontiers(graph, 0), {0: set(), 1: {3}, 2: {3}, 3: set()}
+        )
+
+    def test_dominance_frontiers_random(self):
+        rng = random.Random(0)
+        for _ in range(2000):
+            graph, start = _random_graph(rng)
+            with self.subTest(edges=list(graph.edges), start=start):
+                self.assert_same_frontiers(graph, start)
+                self.assert_same_frontiers(graph.reverse(copy=False), start)